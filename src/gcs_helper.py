@@ -2,6 +2,7 @@
 Google Cloud Storage helper functions
 """
 from google.cloud import storage
+from google.cloud.exceptions import NotFound
 import os
 import json
 
@@ -36,6 +37,32 @@ class GCSHelper:
         print(f"Uploaded {local_path} to gs://{self.bucket_name}/{gcs_path}")
         return f"gs://{self.bucket_name}/{gcs_path}"
     
+    def upload_many(self, pairs, workers=8):
+        """
+        Upload several files to GCS in parallel
+        
+        Args:
+            pairs: List of (local_path, gcs_path) tuples
+            workers: Number of upload threads
+        """
+        # Imported here: transfer_manager warns on import (preview feature) and is only needed for uploads
+        from google.cloud.storage import transfer_manager
+        
+        file_blob_pairs = [(local, self.bucket.blob(gcs)) for local, gcs in pairs]
+        # Uploads are network-bound, so threads are enough and avoid process startup
+        transfer_manager.upload_many(
+            file_blob_pairs,
+            max_workers=workers,
+            worker_type=transfer_manager.THREAD,
+            raise_exception=True
+        )
+        
+        uris = []
+        for local, gcs in pairs:
+            print(f"Uploaded {local} to gs://{self.bucket_name}/{gcs}")
+            uris.append(f"gs://{self.bucket_name}/{gcs}")
+        return uris
+    
     def download_file(self, gcs_path, local_path):
         """
         Download a file from GCS
@@ -51,12 +78,17 @@ class GCSHelper:
         
         blob = self.bucket.blob(gcs_path)
         
-        # Check if blob exists
-        if not blob.exists():
+        # Let the download itself report a missing blob instead of a separate exists() call.
+        # download_to_filename opens local_path before the request, so a NotFound leaves an
+        # empty file behind; remove it so callers' os.path.exists() checks stay meaningful.
+        try:
+            blob.download_to_filename(local_path)
+        except NotFound:
+            if os.path.exists(local_path):
+                os.remove(local_path)
             print(f"File not found: gs://{self.bucket_name}/{gcs_path}")
             return False
         
-        blob.download_to_filename(local_path)
         print(f"Downloaded gs://{self.bucket_name}/{gcs_path} to {local_path}")
         return True
     
@@ -70,6 +102,23 @@ class GCSHelper:
         blob = self.bucket.blob(gcs_path)
         return blob.exists()
     
+    def iter_files(self, prefix='', page_size=1000):
+        """
+        Lazily yield file names in GCS with given prefix
+        
+        Args:
+            prefix: Path prefix to filter
+            page_size: Blobs fetched per API request (1000 is the API maximum)
+        """
+        # Only request names (plus the paging token) to keep responses small
+        blobs = self.client.list_blobs(
+            self.bucket_name,
+            prefix=prefix,
+            page_size=page_size,
+            fields='items/name,nextPageToken'
+        )
+        yield from (blob.name for blob in blobs)
+    
     def list_files(self, prefix=''):
         """
         List files in GCS with given prefix
@@ -77,8 +126,7 @@ class GCSHelper:
         Args:
             prefix: Path prefix to filter
         """
-        blobs = self.client.list_blobs(self.bucket_name, prefix=prefix)
-        return [blob.name for blob in blobs]
+        return list(self.iter_files(prefix))
     
     def delete_file(self, gcs_path):
         """
@@ -88,10 +136,10 @@ class GCSHelper:
             gcs_path: Path in GCS
         """
         blob = self.bucket.blob(gcs_path)
-        if blob.exists():
+        try:
             blob.delete()
             print(f"Deleted gs://{self.bucket_name}/{gcs_path}")
-        else:
+        except NotFound:
             print(f"File not found, cannot delete: gs://{self.bucket_name}/{gcs_path}")
 
 if __name__ == "__main__":
@@ -4,17 +4,56 @@ Generate synthetic sentiment analysis dataset
 import pandas as pd
 import numpy as np
 from datetime import datetime
+from functools import lru_cache
 import os
 
-def generate_sentiment_data(n_samples=1000, drift=False):
+# Below this many samples the plain Python builder is faster than the JIT path
+NUMBA_MIN_SAMPLES = 500_000
+
+@lru_cache(maxsize=None)
+def _numba_builder():
+    """
+    Compile the Numba review builder on first use
+    
+    Numba is optional and slow to import, so it is only loaded for datasets large
+    enough to use it. Returns (build, TypedList), or None if Numba is unavailable.
+    """
+    try:
+        from numba import njit
+        from numba.typed import List as TypedList
+    except ImportError:
+        return None
+    
+    # No cache=True: the on-disk cache records the importing module name, and this module
+    # is imported as both `generate_data` and `src.generate_data`
+    @njit
+    def build(sentiments, lengths, word_idx, vocab_flat, vocab_offsets, prefixes, suffixes):
+        """Assemble review strings from pre-drawn sentiments, lengths and word indices"""
+        reviews = TypedList()
+        pos = 0
+        for i in range(len(sentiments)):
+            s = sentiments[i]
+            base = vocab_offsets[s]
+            words = TypedList()
+            for j in range(pos, pos + lengths[i]):
+                words.append(vocab_flat[base + word_idx[j]])
+            pos += lengths[i]
+            reviews.append(prefixes[s] + ' '.join(words) + suffixes[s])
+        return reviews
+    
+    return build, TypedList
+
+def generate_sentiment_data(n_samples=1000, drift=False, include_timestamp=False):
     """
     Generate synthetic product review data
     
     Args:
         n_samples: Number of samples to generate
         drift: If True, introduce data drift
+        include_timestamp: If True, add a 'timestamp' column (not used by training or drift detection)
     """
-    np.random.seed(42 if not drift else 123)
+    ts = datetime.now()
+    rng = np.random.default_rng(42 if not drift else 123)
     
     # Positive review templates
     positive_words = ['excellent', 'amazing', 'great', 'love', 'perfect', 
@@ -28,34 +67,50 @@ def generate_sentiment_data(n_samples=1000, drift=False):
     neutral_words = ['okay', 'average', 'fine', 'decent', 'acceptable',
                     'normal', 'standard', 'typical', 'regular', 'ordinary']
     
-    reviews = []
-    sentiments = []
+    # Indexed by sentiment: 0 = negative, 1 = neutral, 2 = positive.
+    # Plain lists so indexing yields Python strs directly.
+    vocab = [negative_words, neutral_words, positive_words]
+    templates = {
+        0: ("This product is ", ". Do not buy!"),
+        1: ("This product is ", ". It's acceptable."),
+        2: ("This product is ", ". Highly recommend!")
+    }
     
-    for _ in range(n_samples):
-        sentiment = np.random.choice([0, 1, 2], p=[0.3, 0.4, 0.3])  # neg, neu, pos
-        
-        if drift:
-            # Introduce drift: more negative reviews
-            sentiment = np.random.choice([0, 1, 2], p=[0.5, 0.3, 0.2])
-        
-        if sentiment == 2:  # Positive
-            words = np.random.choice(positive_words, size=np.random.randint(5, 15))
-            review = f"This product is {' '.join(words)}. Highly recommend!"
-        elif sentiment == 0:  # Negative
-            words = np.random.choice(negative_words, size=np.random.randint(5, 15))
-            review = f"This product is {' '.join(words)}. Do not buy!"
-        else:  # Neutral
-            words = np.random.choice(neutral_words, size=np.random.randint(5, 15))
-            review = f"This product is {' '.join(words)}. It's acceptable."
+    # Introduce drift: more negative reviews
+    probs = [0.5, 0.3, 0.2] if drift else [0.3, 0.4, 0.3]  # neg, neu, pos
+    
+    # Draw all randomness up front instead of per sample
+    sentiments = rng.choice(3, size=n_samples, p=probs)
+    lengths = rng.integers(5, 15, size=n_samples)
+    word_idx = rng.integers(0, 10, size=lengths.sum())
+    
+    builder = _numba_builder() if n_samples >= NUMBA_MIN_SAMPLES else None
+    
+    if builder is not None:
+        build, TypedList = builder
+        vocab_flat = TypedList([word for words in vocab for word in words])
+        vocab_offsets = np.cumsum([0] + [len(words) for words in vocab])
+        prefixes = TypedList([templates[s][0] for s in range(3)])
+        suffixes = TypedList([templates[s][1] for s in range(3)])
+        reviews = list(build(sentiments, lengths, word_idx, vocab_flat, vocab_offsets,
+                             prefixes, suffixes))
+    else:
+        word_idx = word_idx.tolist()
+        ends = np.cumsum(lengths).tolist()
+        starts = [0] + ends[:-1]
+        chunked_word_indices = (word_idx[a:b] for a, b in zip(starts, ends))
         
-        reviews.append(review)
-        sentiments.append(sentiment)
+        reviews = [
+            templates[s][0] + ' '.join(map(vocab[s].__getitem__, widx)) + templates[s][1]
+            for s, widx in zip(sentiments.tolist(), chunked_word_indices)
+        ]
     
     df = pd.DataFrame({
         'review': reviews,
-        'sentiment': sentiments,
-        'timestamp': datetime.now()
+        'sentiment': sentiments
     })
+    if include_timestamp:
+        df['timestamp'] = ts
     
     return df
 
@@ -3,15 +3,22 @@ Train sentiment analysis model
 """
 import pandas as pd
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
 from sklearn.naive_bayes import MultinomialNB
 from sklearn.pipeline import Pipeline
 from sklearn.model_selection import train_test_split
 import joblib
-import json
+import orjson
 from datetime import datetime
 import os
 
+# LZ4 gives much smaller pickles at almost no CPU cost; fall back to zlib if it's missing
+try:
+    import lz4  # noqa: F401
+    MODEL_COMPRESSION = ('lz4', 3)
+except ImportError:
+    MODEL_COMPRESSION = 3
+
 def train_sentiment_model(data_path, model_output_path, metrics_output_path):
     """
     Train a sentiment analysis model
@@ -19,20 +26,27 @@ def train_sentiment_model(data_path, model_output_path, metrics_output_path):
     print("Loading data...")
     df = pd.read_csv(data_path)
     
-    # Split data
-    X_train, X_test, y_train, y_test = train_test_split(
-        df['review'], df['sentiment'], 
+    # Split row indices only, then slice, so the review strings are not shuffled and copied
+    idx = np.arange(len(df))
+    train_idx, test_idx = train_test_split(
+        idx,
         test_size=0.2, 
         random_state=42,
-        stratify=df['sentiment']
+        stratify=df['sentiment'].to_numpy()
     )
+    X_train = df['review'].iloc[train_idx]
+    X_test = df['review'].iloc[test_idx]
+    y_train = df['sentiment'].iloc[train_idx]
+    y_test = df['sentiment'].iloc[test_idx]
     
     print(f"Training samples: {len(X_train)}")
     print(f"Test samples: {len(X_test)}")
     
-    # Create pipeline
+    # Create pipeline (hashing avoids building a vocabulary dict on every fit)
     model = Pipeline([
-        ('tfidf', TfidfVectorizer(max_features=1000, ngram_range=(1, 2))),
+        ('hash', HashingVectorizer(n_features=1024, ngram_range=(1, 2),
+                                   alternate_sign=False, norm=None)),
+        ('tfidf', TfidfTransformer()),
         ('classifier', MultinomialNB(alpha=0.1))
     ])
     
@@ -48,7 +62,7 @@ def train_sentiment_model(data_path, model_output_path, metrics_output_path):
     
     # Save model
     os.makedirs(os.path.dirname(model_output_path), exist_ok=True)
-    joblib.dump(model, model_output_path)
+    joblib.dump(model, model_output_path, compress=MODEL_COMPRESSION)
     print(f"Model saved to {model_output_path}")
     
     # Save metrics
@@ -62,8 +76,11 @@ def train_sentiment_model(data_path, model_output_path, metrics_output_path):
     }
     
     os.makedirs(os.path.dirname(metrics_output_path), exist_ok=True)
-    with open(metrics_output_path, 'w') as f:
-        json.dump(metrics, f, indent=4)
+    # Write to a temp file and swap it in so readers never see partial metrics
+    tmp_path = f"{metrics_output_path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(orjson.dumps(metrics, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+    os.replace(tmp_path, metrics_output_path)
     
     print(f"Metrics saved to {metrics_output_path}")
     